@@ -1,11 +1,15 @@
 import os
-from flask import Flask, render_template, request, jsonify, send_file, session
+import mimetypes
+from flask import Flask, render_template, request, jsonify, send_file, send_from_directory, session, url_for, abort
 from dotenv import load_dotenv
+
+# Load .env before the services import; some read their settings at import time
+load_dotenv()
+
 from services import PDFService, AIService, StorageService
 from user_service import UserService
 from auth_service import AuthService
-
-load_dotenv()
+from asset_service import AssetService
 
 app = Flask(__name__)
 app.config['UPLOAD_FOLDER'] = 'uploads'
@@ -16,10 +20,37 @@ app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'flashmind-secret-key-change-
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 os.makedirs('data', exist_ok=True)
 
+@app.context_processor
+def asset_helpers():
+    def asset_urls(bundle):
+        built = AssetService.get_bundle(bundle)
+        if built:
+            return [url_for('serve_asset', filename=built)]
+        # Not built (or sources edited since): serve the individual source files
+        return [url_for('static', filename=source) for source in AssetService.BUNDLES[bundle]]
+    return {'asset_urls': asset_urls}
+
 @app.route('/')
 def index():
     return render_template('index.html')
 
+@app.route('/assets/<path:filename>')
+def serve_asset(filename):
+    variant, encoding = AssetService.get_variant(filename, request.accept_encodings)
+    if not variant:
+        abort(404)
+    
+    # Filenames are content-hashed, so clients may cache them forever
+    response = send_from_directory(AssetService.DIST_DIR, variant,
+                                   mimetype=mimetypes.guess_type(filename)[0],
+                                   max_age=AssetService.MAX_AGE, conditional=True, etag=True)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    response.vary.add('Accept-Encoding')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return response
+
 @app.route('/api/upload', methods=['POST'])
 def upload_file():
     if 'file' not in request.files:
@@ -0,0 +1,271 @@
+"""
+Static asset build step.
+Bundles and minifies the CSS/JS under static/, writes content-hashed files
+plus precompressed .gz (and .br, if the optional brotli package is
+installed) variants to dist/ and a manifest.json that app.py uses to
+reference and serve them from /assets/.
+
+Usage:
+    python asset_service.py           # build; earlier versions are kept
+    python asset_service.py --prune   # delete versions the manifest no longer references
+"""
+
+import os
+import re
+import sys
+import json
+import gzip
+import hashlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class AssetService:
+    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+    STATIC_DIR = os.path.join(BASE_DIR, 'static')
+    # Outside static/ so bundles are only reachable through the cached /assets/ route
+    DIST_DIR = os.path.join(BASE_DIR, 'dist')
+    MANIFEST_PATH = os.path.join(DIST_DIR, 'manifest.json')
+    MAX_AGE = 365 * 24 * 60 * 60
+
+    # Bundle name -> source files (relative to static/), in load order
+    BUNDLES = {
+        'app.css': ['css/style.css', 'css/leaderboard.css'],
+        'app.js': ['js/app.js'],
+    }
+
+    # Any build's output, not just the current one, so pages cached before a rebuild keep working
+    FINGERPRINTED_RE = re.compile(r'^[\w-]+\.[0-9a-f]{12}\.(css|js)$')
+    # After these characters (or keywords) a '/' starts a regex literal rather than a division
+    REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+    REGEX_KEYWORDS = ('return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete', 'void', 'throw')
+
+    _manifest = None
+    _manifest_mtime = None
+
+    @staticmethod
+    def _starts_regex(code_before, after_literal):
+        """Heuristic: does a '/' following this code open a JS regex literal?"""
+        code_before = code_before.rstrip()
+        if not code_before:
+            return not after_literal
+        if code_before[-1] in AssetService.REGEX_PRECEDERS:
+            return True
+        word = re.search(r'[\w$]+$', code_before)
+        return bool(word) and word.group() in AssetService.REGEX_KEYWORDS
+
+    @staticmethod
+    def _regex_end(source, i):
+        """Index just past the regex literal starting at source[i], or None if it isn't one"""
+        j = i + 1
+        in_class = False
+        n = len(source)
+        while j < n:
+            c = source[j]
+            if c == '\\':
+                j += 2
+                continue
+            if c == '\n':
+                return None
+            if c == '[':
+                in_class = True
+            elif c == ']':
+                in_class = False
+            elif c == '/' and not in_class:
+                j += 1
+                while j < n and source[j].isalpha():
+                    j += 1
+                return j
+            j += 1
+        return None
+
+    @staticmethod
+    def _split_literals(source, quotes, line_comments=False, regex_literals=False):
+        """Yield alternating (code, False) / (literal, True) chunks.
+
+        Comments are dropped from the code chunks (a block comment becomes a
+        space, or a newline if it spanned lines) so the whitespace around
+        them collapses as one run. With regex_literals, JS regex literals are
+        kept verbatim; they are told apart from division by the preceding
+        token, which covers the usual cases but is not a full JS parser.
+        """
+        code = []
+        chunk_start = i = 0
+        after_literal = False
+        n = len(source)
+        while i < n:
+            c = source[i]
+            regex_end = None
+            if (regex_literals and c == '/' and source[i + 1:i + 2] not in ('/', '*')
+                    and AssetService._starts_regex(''.join(code) + source[chunk_start:i], after_literal)):
+                regex_end = AssetService._regex_end(source, i)
+            if regex_end is not None:
+                code.append(source[chunk_start:i])
+                yield ''.join(code), False
+                yield source[i:regex_end], True
+                code = []
+                after_literal = True
+                chunk_start = i = regex_end
+            elif c in quotes:
+                j = i + 1
+                while j < n and source[j] != c:
+                    j += 2 if source[j] == '\\' else 1
+                code.append(source[chunk_start:i])
+                yield ''.join(code), False
+                yield source[i:j + 1], True
+                code = []
+                after_literal = True
+                chunk_start = i = j + 1
+            elif source.startswith('/*', i):
+                end = source.find('*/', i + 2)
+                end = n if end == -1 else end + 2
+                # Keep a newline if the comment spanned lines, so JS ASI is unaffected
+                code.append(source[chunk_start:i] + ('\n' if '\n' in source[i:end] else ' '))
+                chunk_start = i = end
+            elif line_comments and source.startswith('//', i):
+                code.append(source[chunk_start:i])
+                end = source.find('\n', i)
+                chunk_start = i = n if end == -1 else end
+            else:
+                i += 1
+        code.append(source[chunk_start:])
+        yield ''.join(code), False
+
+    @staticmethod
+    def minify_css(source):
+        out = []
+        for text, is_literal in AssetService._split_literals(source, '"\''):
+            if not is_literal:
+                text = re.sub(r'\s+', ' ', text)
+                text = re.sub(r'\s*([{};,>])\s*', r'\1', text)
+                text = re.sub(r':\s+', ':', text)
+                text = text.replace(';}', '}')
+            out.append(text)
+        return ''.join(out).strip()
+
+    @staticmethod
+    def minify_js(source):
+        """Strip comments and indentation; newlines are kept so ASI still holds"""
+        out = []
+        for text, is_literal in AssetService._split_literals(source, '"\'`', line_comments=True,
+                                                             regex_literals=True):
+            if not is_literal:
+                text = re.sub(r'[ \t]*\n\s*', '\n', text)
+                text = re.sub(r'[ \t]+', ' ', text)
+            out.append(text)
+        return ''.join(out).strip() + '\n'
+
+    @staticmethod
+    def build():
+        """Write fingerprinted, minified, precompressed bundles and return a size report.
+
+        Earlier bundles are left in place so pages that still reference them keep working.
+        """
+        os.makedirs(AssetService.DIST_DIR, exist_ok=True)
+
+        manifest = {}
+        report = {}
+        for bundle, sources in AssetService.BUNDLES.items():
+            raw = ''
+            for source in sources:
+                with open(os.path.join(AssetService.STATIC_DIR, source), 'r', encoding='utf-8') as f:
+                    raw += f.read() + '\n'
+
+            minify = AssetService.minify_css if bundle.endswith('.css') else AssetService.minify_js
+            data = minify(raw).encode('utf-8')
+
+            name, ext = os.path.splitext(bundle)
+            digest = hashlib.sha256(data).hexdigest()[:12]
+            filename = f"{name}.{digest}{ext}"
+            variants = {
+                '': data,
+                '.gz': gzip.compress(data, compresslevel=9, mtime=0),
+            }
+            if brotli is not None:
+                variants['.br'] = brotli.compress(data, quality=11)
+            for suffix, content in variants.items():
+                with open(os.path.join(AssetService.DIST_DIR, filename + suffix), 'wb') as f:
+                    f.write(content)
+
+            manifest[bundle] = filename
+            report[bundle] = {
+                'file': filename,
+                'sources': len(sources),
+                'raw_bytes': len(raw.encode('utf-8')),
+                'minified_bytes': len(data),
+                'gzip_bytes': len(variants['.gz']),
+                'brotli_bytes': len(variants['.br']) if '.br' in variants else None,
+            }
+
+        # Swap the manifest in atomically, only once every file it names exists
+        tmp_path = AssetService.MANIFEST_PATH + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, AssetService.MANIFEST_PATH)
+        AssetService._manifest = None
+        return report
+
+    @staticmethod
+    def prune():
+        """Delete bundles the current manifest no longer references. Returns removed filenames."""
+        current = set(AssetService.get_manifest().values())
+        if not current:
+            return []
+        removed = []
+        for filename in os.listdir(AssetService.DIST_DIR):
+            base = filename[:-3] if filename.endswith(('.gz', '.br')) else filename
+            if filename != os.path.basename(AssetService.MANIFEST_PATH) and base not in current:
+                os.remove(os.path.join(AssetService.DIST_DIR, filename))
+                removed.append(filename)
+        return removed
+
+    @staticmethod
+    def get_manifest():
+        try:
+            mtime = os.path.getmtime(AssetService.MANIFEST_PATH)
+        except OSError:
+            return {}
+        if AssetService._manifest is None or mtime != AssetService._manifest_mtime:
+            with open(AssetService.MANIFEST_PATH, 'r') as f:
+                AssetService._manifest = json.load(f)
+            AssetService._manifest_mtime = mtime
+        return AssetService._manifest
+
+    @staticmethod
+    def get_bundle(bundle):
+        """Fingerprinted filename for a bundle, or None if unbuilt or older than its sources"""
+        filename = AssetService.get_manifest().get(bundle)
+        if not filename:
+            return None
+        for source in AssetService.BUNDLES[bundle]:
+            if os.path.getmtime(os.path.join(AssetService.STATIC_DIR, source)) > AssetService._manifest_mtime:
+                return None
+        return filename
+
+    @staticmethod
+    def get_variant(filename, accept_encodings):
+        """Pick the best precompressed file for a client. Returns (file, content_encoding)."""
+        if not AssetService.FINGERPRINTED_RE.match(filename) \
+                or not os.path.isfile(os.path.join(AssetService.DIST_DIR, filename)):
+            return None, None
+        for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+            if accept_encodings[encoding] > 0 and os.path.exists(os.path.join(AssetService.DIST_DIR, filename + suffix)):
+                return filename + suffix, encoding
+        return filename, None
+
+
+if __name__ == '__main__':
+    if '--prune' in sys.argv[1:]:
+        for filename in AssetService.prune():
+            print(f"removed {filename}")
+        sys.exit(0)
+
+    report = AssetService.build()
+    for bundle, stats in report.items():
+        print(f"{stats['file']:28} {stats['sources']} source(s)  raw {stats['raw_bytes']:>7}  "
+              f"min {stats['minified_bytes']:>7}  gzip {stats['gzip_bytes']:>6}  br {stats['brotli_bytes'] or '-':>6}")
+    if brotli is None:
+        print("brotli not installed (optional: pip install brotli); only gzip variants were written")
@@ -1,8 +1,8 @@
 import os
 import json
-import hashlib
 import uuid
 from datetime import datetime, timedelta
+from password_service import PasswordService
 
 class AuthService:
     DATA_DIR = 'data/users'
@@ -13,7 +13,7 @@ class AuthService:
 
     @staticmethod
     def hash_password(password):
-        return hashlib.sha256(password.encode()).hexdigest()
+        return PasswordService.hash_password(password)
 
     @staticmethod
     def register(username, email, password):
@@ -56,14 +56,21 @@ class AuthService:
     @staticmethod
     def login(email, password):
         users = AuthService.get_all_users()
-        hashed = AuthService.hash_password(password)
+        user = next((u for u in users if u.get('email') == email), None)
         
-        for user in users:
-            if user.get('email') == email and user.get('password') == hashed:
-                user.pop('password', None)
-                return user, None
+        if user is None:
+            # Pay the same KDF cost so response time doesn't reveal which emails exist
+            PasswordService.verify_password(password, PasswordService.get_dummy_hash())
+            return None, "Invalid email or password"
+        
+        stored = user.pop('password', None)
+        if not PasswordService.verify_password(password, stored):
+            return None, "Invalid email or password"
         
-        return None, "Invalid email or password"
+        # Transparently upgrade legacy/outdated hashes now that we have the plaintext
+        if PasswordService.needs_rehash(stored):
+            AuthService.update_user(user['id'], {'password': AuthService.hash_password(password)})
+        return user, None
 
     @staticmethod
     def get_all_users():
@@ -0,0 +1,488 @@
+"""
+API Load-Test / Benchmark Harness
+This script seeds a sandboxed data directory with synthetic users, decks and
+PDFs, drives every route in app.py concurrently with a stubbed AIService and
+reports throughput and p50/p95/p99 latency per endpoint as JSON.
+
+Usage:
+    python benchmark.py --users 1000 --concurrency 8 --iterations 20 --output bench.json
+    python benchmark.py --users 10000 --compare bench.json
+    python benchmark.py --scenario login --hash-workers 0 --output login-inline.json
+    python benchmark.py --scenario login --hash-workers 4 --compare login-inline.json
+"""
+
+import os
+import re
+import sys
+import json
+import math
+import time
+import shutil
+import random
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+from io import BytesIO
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+# Add parent directory to path to import app and services
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT_DIR)
+
+from asset_service import AssetService
+
+BENCH_PASSWORD = "benchmark-password"
+
+ENDPOINTS = [
+    "GET /",
+    "GET /assets/<file>",
+    "POST /api/auth/register",
+    "POST /api/auth/logout",
+    "POST /api/auth/login",
+    "GET /api/auth/me",
+    "POST /api/upload",
+    "POST /api/generate",
+    "GET /api/flashcards",
+    "POST /api/user/deck-created",
+    "POST /api/user/complete-deck",
+    "GET /api/leaderboard",
+]
+
+
+def stub_generate_flashcards(text, difficulty, amount):
+    """Deterministic stand-in for AIService.generate_flashcards (no network)"""
+    words = text.split() or ["empty"]
+    flashcards = []
+    for i in range(amount):
+        word = words[i % len(words)]
+        flashcards.append({
+            "id": f"card_{i + 1}",
+            "type": "qa",
+            "question": f"What does '{word}' refer to?",
+            "options": None,
+            "answer": word,
+            "explanation": f"'{word}' appears in the source text.",
+            "difficulty": difficulty,
+            "category": "Benchmark"
+        })
+    return flashcards
+
+
+def build_pdf(lines):
+    """Build a minimal single-page PDF containing the given lines of text"""
+    def escape(s):
+        return s.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+    stream = "BT /F1 12 Tf 14 TL 72 720 Td " + " ".join(f"({escape(l)}) '" for l in lines) + " ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        "/Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>",
+        f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+
+    xref_offset = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode("latin-1")
+    out += (f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+            f"startxref\n{xref_offset}\n%%EOF\n").encode("latin-1")
+    return out
+
+
+def seed_data(auth_service, storage_service, upload_dir, users, decks, pdfs):
+    """Write synthetic users, decks and PDFs straight to the sandbox"""
+    auth_service.ensure_dir()
+    # Every seeded user shares one password, so hash it once
+    hashed = auth_service.hash_password(BENCH_PASSWORD)
+    created_at = datetime.now().isoformat()
+
+    for i in range(users):
+        user_id = f"bench-user-{i}"
+        user_data = {
+            "id": user_id,
+            "username": f"bench_user_{i}",
+            "email": f"bench{i}@example.com",
+            "password": hashed,
+            "created_at": created_at,
+            "total_xp": (i * 37) % 5000,
+            "current_level": 1,
+            "xp_for_next_level": 100,
+            "streak": i % 10,
+            "last_activity_date": None,
+            "decks_completed": i % 7,
+            "decks_created": i % 5,
+            "cards_mastered": i % 50,
+            "achievements": [],
+            "deck_history": []
+        }
+        with open(os.path.join(auth_service.DATA_DIR, f"{user_id}.json"), 'w') as f:
+            json.dump(user_data, f, indent=2)
+
+    for i in range(decks):
+        storage_service.save_session(f"bench_deck_{i}.pdf", stub_generate_flashcards(
+            f"benchmark deck number {i} covering synthetic study material", "medium", 10))
+
+    pdf_blobs = []
+    for i in range(pdfs):
+        lines = [f"Benchmark document {i} paragraph {n}: synthetic study material for load testing."
+                 for n in range(40)]
+        blob = build_pdf(lines)
+        with open(os.path.join(upload_dir, f"bench_pdf_{i}.pdf"), 'wb') as f:
+            f.write(blob)
+        pdf_blobs.append(blob)
+    return pdf_blobs
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Recorder:
+    """Thread-safe collection of per-endpoint latencies and status codes"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {name: [] for name in ENDPOINTS}
+        self.errors = {name: 0 for name in ENDPOINTS}
+
+    def timed(self, name, call):
+        start = time.perf_counter()
+        response = call()
+        elapsed = time.perf_counter() - start
+        with self.lock:
+            self.latencies[name].append(elapsed)
+            if response.status_code >= 400:
+                self.errors[name] += 1
+        return response
+
+    def summary(self, wall_seconds):
+        endpoints = {}
+        all_latencies = []
+        total_errors = 0
+        for name in ENDPOINTS:
+            values = sorted(self.latencies[name])
+            all_latencies.extend(values)
+            total_errors += self.errors[name]
+            endpoints[name] = summarize(values, self.errors[name], wall_seconds)
+        all_latencies.sort()
+        return endpoints, summarize(all_latencies, total_errors, wall_seconds)
+
+
+def summarize(values, errors, wall_seconds):
+    count = len(values)
+    return {
+        "count": count,
+        "errors": errors,
+        "throughput_rps": round(count / wall_seconds, 2) if wall_seconds else 0.0,
+        "mean_ms": round(sum(values) / count * 1000, 3) if count else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "max_ms": round(values[-1] * 1000, 3) if count else 0.0,
+    }
+
+
+def run_worker(app, recorder, worker_id, args, pdf_blobs):
+    """Run a full user journey through every route, `iterations` times"""
+    rng = random.Random(args.seed + worker_id)
+    client = app.test_client()
+
+    for i in range(args.iterations):
+        # Each worker owns a disjoint slice of seeded users (parse_args enforces enough users)
+        user_index = worker_id + i * args.concurrency
+        pdf_index = rng.randrange(len(pdf_blobs))
+        deck_index = rng.randrange(args.decks)
+        upload_name = f"bench_upload_w{worker_id}_{i}.pdf"
+
+        recorder.timed("GET /", lambda: client.get('/'))
+        for bundle in AssetService.BUNDLES:
+            # Skipped when assets haven't been built; the page then uses /static directly
+            built = AssetService.get_bundle(bundle)
+            if built:
+                recorder.timed("GET /assets/<file>", lambda: client.get(
+                    f'/assets/{built}', headers={'Accept-Encoding': 'br, gzip'}))
+        recorder.timed("POST /api/auth/register", lambda: client.post('/api/auth/register', json={
+            'username': f"new_w{worker_id}_{i}",
+            'email': f"new_w{worker_id}_{i}@example.com",
+            'password': BENCH_PASSWORD
+        }))
+        recorder.timed("POST /api/auth/logout", lambda: client.post('/api/auth/logout'))
+        recorder.timed("POST /api/auth/login", lambda: client.post('/api/auth/login', json={
+            'email': f"bench{user_index}@example.com",
+            'password': BENCH_PASSWORD
+        }))
+        recorder.timed("GET /api/auth/me", lambda: client.get('/api/auth/me'))
+        recorder.timed("POST /api/upload", lambda: client.post('/api/upload', data={
+            'file': (BytesIO(pdf_blobs[pdf_index]), upload_name)
+        }, content_type='multipart/form-data'))
+        recorder.timed("POST /api/generate", lambda: client.post('/api/generate', json={
+            'filename': upload_name,
+            'difficulty': 'medium',
+            'amount': args.cards
+        }))
+        recorder.timed("GET /api/flashcards", lambda: client.get(
+            '/api/flashcards', query_string={'filename': f"bench_deck_{deck_index}.pdf"}))
+        recorder.timed("POST /api/user/deck-created", lambda: client.post('/api/user/deck-created', json={
+            'deck_name': upload_name,
+            'cards_count': args.cards,
+            'difficulty': 'medium'
+        }))
+        recorder.timed("POST /api/user/complete-deck", lambda: client.post('/api/user/complete-deck', json={
+            'deck_name': upload_name,
+            'cards_count': args.cards
+        }))
+        recorder.timed("GET /api/leaderboard", lambda: client.get('/api/leaderboard'))
+
+
+def run_login_worker(app, recorder, worker_id, args, pdf_blobs):
+    """Hammer only the login route to isolate password hashing cost"""
+    client = app.test_client()
+
+    for i in range(args.iterations):
+        user_index = worker_id + i * args.concurrency
+        recorder.timed("POST /api/auth/login", lambda: client.post('/api/auth/login', json={
+            'email': f"bench{user_index}@example.com",
+            'password': BENCH_PASSWORD
+        }))
+
+
+SCENARIOS = {
+    "journey": run_worker,
+    "login": run_login_worker,
+}
+
+
+def load_page(client, cache):
+    """One page view through a minimal browser cache. Returns (asset requests, asset bytes on the wire)."""
+    page = client.get('/', headers={'Accept-Encoding': 'br, gzip'})
+    requests = 0
+    total_bytes = 0
+    for url in re.findall(r'(?:href|src)="(/[^/"][^"]*)"', page.get_data(as_text=True)):
+        cached = cache.get(url)
+        if cached and cached['fresh']:
+            continue
+        headers = {'Accept-Encoding': 'br, gzip'}
+        if cached and cached['etag']:
+            headers['If-None-Match'] = cached['etag']
+        if cached and cached['last_modified']:
+            headers['If-Modified-Since'] = cached['last_modified']
+        response = client.get(url, headers=headers)
+        requests += 1
+        total_bytes += len(response.get_data())
+        if response.status_code == 200:
+            cache_control = response.cache_control
+            cache[url] = {
+                'fresh': bool(cache_control.immutable or (cache_control.max_age and not cache_control.no_cache)),
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+            }
+    return requests, total_bytes
+
+
+def measure_page_weight(app):
+    """First and repeat page loads, with the unbundled /static files and with the built bundles"""
+    def views():
+        client = app.test_client()
+        cache = {}
+        first = load_page(client, cache)
+        repeat = load_page(client, cache)
+        return {
+            "first_load": {"requests": first[0], "bytes": first[1]},
+            "repeat_load": {"requests": repeat[0], "bytes": repeat[1]},
+        }
+
+    bundled = views() if all(AssetService.get_bundle(b) for b in AssetService.BUNDLES) else None
+
+    # Point at a missing manifest to force the unbundled fallback
+    manifest_path = AssetService.MANIFEST_PATH
+    AssetService.MANIFEST_PATH = manifest_path + '.missing'
+    AssetService._manifest = None
+    try:
+        unbundled = views()
+    finally:
+        AssetService.MANIFEST_PATH = manifest_path
+        AssetService._manifest = None
+
+    return {"unbundled": unbundled, "bundled": bundled}
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline_path):
+    """Print per-endpoint p50/p95 and throughput deltas against a previous report"""
+    with open(baseline_path, 'r') as f:
+        baseline = json.load(f)
+
+    print(f"\nComparison against {baseline_path} (commit {baseline['meta'].get('commit')})", file=sys.stderr)
+    print(f"{'endpoint':32} {'p50 Δ%':>9} {'p95 Δ%':>9} {'rps Δ%':>9}", file=sys.stderr)
+    for name, current in report["endpoints"].items():
+        previous = baseline["endpoints"].get(name)
+        if not previous:
+            continue
+        deltas = []
+        for key in ("p50_ms", "p95_ms", "throughput_rps"):
+            before = previous[key]
+            deltas.append((current[key] - before) / before * 100 if before else 0.0)
+        print(f"{name:32} {deltas[0]:>+8.1f}% {deltas[1]:>+8.1f}% {deltas[2]:>+8.1f}%", file=sys.stderr)
+
+
+def print_table(report):
+    print(f"{'endpoint':32} {'count':>7} {'err':>5} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}",
+          file=sys.stderr)
+    rows = list(report["endpoints"].items()) + [("TOTAL", report["total"])]
+    for name, stats in rows:
+        print(f"{name:32} {stats['count']:>7} {stats['errors']:>5} {stats['throughput_rps']:>9.1f} "
+              f"{stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f}", file=sys.stderr)
+
+    print(f"\n{'static assets':32} {'first load':>22} {'repeat load':>22}", file=sys.stderr)
+    for mode, views in report["page_weight"].items():
+        if views is None:
+            print(f"{mode:32} {'(not built)':>22}", file=sys.stderr)
+            continue
+        first, repeat = views["first_load"], views["repeat_load"]
+        print(f"{mode:32} {first['requests']:>4} req {first['bytes']:>10} B "
+              f"{repeat['requests']:>4} req {repeat['bytes']:>10} B", file=sys.stderr)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every FlashMind API route against synthetic data.")
+    parser.add_argument("--users", type=int, default=1000, help="seeded users (e.g. 1000, 10000, 100000)")
+    parser.add_argument("--decks", type=int, default=100, help="seeded flashcard decks")
+    parser.add_argument("--pdfs", type=int, default=10, help="distinct synthetic PDFs to upload")
+    parser.add_argument("--cards", type=int, default=10, help="flashcards per generated deck")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent client workers")
+    parser.add_argument("--iterations", type=int, default=20, help="journeys through every route per worker")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for deck/PDF selection")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="journey",
+                        help="'journey' hits every route, 'login' hits only /api/auth/login")
+    parser.add_argument("--hash-workers", type=int,
+                        help="password hashing process pool size (0 hashes inline on the request thread)")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--compare", help="previous JSON report to diff against")
+    parser.add_argument("--keep-data", action="store_true", help="keep the sandbox directory after the run")
+    args = parser.parse_args(argv)
+    if min(args.users, args.decks, args.pdfs, args.cards, args.concurrency, args.iterations) < 1:
+        parser.error("all counts must be at least 1")
+    if args.users < args.concurrency * args.iterations:
+        # Workers would share users and race on read-modify-write of their JSON files
+        parser.error(f"--users must be at least concurrency x iterations "
+                     f"({args.concurrency * args.iterations}) so each journey gets its own user")
+    return args
+
+
+def run_benchmark(args):
+    sandbox = tempfile.mkdtemp(prefix="flashmind-bench-")
+    original_cwd = os.getcwd()
+    # app.py creates 'uploads' and 'data' relative to the cwd at import time
+    os.chdir(sandbox)
+
+    try:
+        from app import app
+        from services import AIService, StorageService
+        from auth_service import AuthService
+        from password_service import PasswordService
+
+        upload_dir = os.path.join(sandbox, 'uploads')
+        AuthService.DATA_DIR = os.path.join(sandbox, 'data', 'users')
+        StorageService.DATA_DIR = os.path.join(sandbox, 'data')
+        app.config['UPLOAD_FOLDER'] = upload_dir
+        AIService.generate_flashcards = staticmethod(stub_generate_flashcards)
+        if args.hash_workers is not None:
+            PasswordService.shutdown()
+            PasswordService.MAX_WORKERS = args.hash_workers
+            PasswordService.MAX_PENDING = 4 * max(args.hash_workers, 1)
+
+        print(f"Seeding {args.users} users, {args.decks} decks, {args.pdfs} PDFs in {sandbox}...",
+              file=sys.stderr)
+        seed_start = time.perf_counter()
+        pdf_blobs = seed_data(AuthService, StorageService, upload_dir, args.users, args.decks, args.pdfs)
+        seed_seconds = time.perf_counter() - seed_start
+
+        page_weight = measure_page_weight(app)
+
+        recorder = Recorder()
+        print(f"Running {args.concurrency} workers x {args.iterations} {args.scenario} iterations...",
+              file=sys.stderr)
+        run_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            futures = [pool.submit(SCENARIOS[args.scenario], app, recorder, worker_id, args, pdf_blobs)
+                       for worker_id in range(args.concurrency)]
+            for future in futures:
+                future.result()
+        wall_seconds = time.perf_counter() - run_start
+
+        endpoints, total = recorder.summary(wall_seconds)
+        return {
+            "meta": {
+                "commit": git_commit(),
+                "timestamp": datetime.now().isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "users": args.users,
+                "decks": args.decks,
+                "pdfs": args.pdfs,
+                "cards": args.cards,
+                "concurrency": args.concurrency,
+                "iterations": args.iterations,
+                "seed": args.seed,
+                "scenario": args.scenario,
+                "hash_algorithm": PasswordService.DEFAULT_ALGORITHM,
+                "hash_workers": PasswordService.MAX_WORKERS,
+                "seed_seconds": round(seed_seconds, 3),
+                "wall_seconds": round(wall_seconds, 3),
+            },
+            "endpoints": endpoints,
+            "total": total,
+            # bundled is null until `python asset_service.py` has been run
+            "page_weight": page_weight,
+        }
+    finally:
+        os.chdir(original_cwd)
+        if args.keep_data:
+            print(f"Sandbox kept at {sandbox}", file=sys.stderr)
+        else:
+            shutil.rmtree(sandbox, ignore_errors=True)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = run_benchmark(args)
+    print_table(report)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + "\n")
+        print(f"\nReport written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+import os
+import base64
+import atexit
+import hashlib
+import hmac
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+
+class PasswordHasher:
+    """Base class for salted KDF hashers.
+
+    Hashes are stored as ``algorithm$key=value,...$salt$digest`` so every
+    hash carries the parameters it was created with.
+    """
+    algorithm = None
+    salt_bytes = 16
+
+    def params(self):
+        """Parameters used for new hashes"""
+        return {}
+
+    @staticmethod
+    def derive(password, salt, params):
+        raise NotImplementedError
+
+    def encode(self, params, salt, digest):
+        param_str = ",".join(f"{k}={v}" for k, v in sorted(params.items()))
+        return "$".join([
+            self.algorithm,
+            param_str,
+            base64.b64encode(salt).decode('ascii'),
+            base64.b64encode(digest).decode('ascii')
+        ])
+
+    def decode(self, encoded):
+        algorithm, param_str, salt, digest = encoded.split('$')
+        params = {}
+        for item in filter(None, param_str.split(',')):
+            key, value = item.split('=')
+            params[key] = int(value)
+        if params.keys() != self.params().keys():
+            raise ValueError(f"Unexpected {self.algorithm} parameters: {param_str}")
+        return params, base64.b64decode(salt), base64.b64decode(digest)
+
+    def needs_rehash(self, encoded):
+        params, _, _ = self.decode(encoded)
+        return params != self.params()
+
+
+class PBKDF2Hasher(PasswordHasher):
+    algorithm = 'pbkdf2_sha256'
+    iterations = 600000
+
+    def params(self):
+        return {'iterations': self.iterations}
+
+    @staticmethod
+    def derive(password, salt, params):
+        return hashlib.pbkdf2_hmac('sha256', password.encode(), salt, params['iterations'])
+
+
+class ScryptHasher(PasswordHasher):
+    algorithm = 'scrypt'
+    n = 2 ** 14
+    r = 8
+    p = 1
+
+    def params(self):
+        return {'n': self.n, 'r': self.r, 'p': self.p}
+
+    @staticmethod
+    def derive(password, salt, params):
+        return hashlib.scrypt(password.encode(), salt=salt, n=params['n'], r=params['r'],
+                              p=params['p'], maxmem=256 * params['n'] * params['r'], dklen=32)
+
+
+class LegacySHA256Hasher(PasswordHasher):
+    """Unsalted SHA-256 hex digests from before the KDF switch. Verify only."""
+    algorithm = 'sha256'
+
+    @staticmethod
+    def derive(password, salt, params):
+        return hashlib.sha256(password.encode()).hexdigest().encode('ascii')
+
+    def encode(self, params, salt, digest):
+        return digest.decode('ascii')
+
+    def decode(self, encoded):
+        return {}, b'', encoded.encode('ascii')
+
+    def needs_rehash(self, encoded):
+        return True
+
+
+class PasswordService:
+    HASHERS = {
+        hasher.algorithm: hasher
+        for hasher in (ScryptHasher(), PBKDF2Hasher(), LegacySHA256Hasher())
+    }
+    DEFAULT_ALGORITHM = os.getenv('PASSWORD_HASH_ALGORITHM', 'scrypt')
+    # 0 runs the KDF inline on the request thread
+    MAX_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', min(4, os.cpu_count() or 1)))
+    # Requests beyond this wait for a slot instead of queueing unbounded work
+    MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 4 * max(MAX_WORKERS, 1)))
+
+    _pool = None
+    _pending = None
+    _dummy_hash = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def register_hasher(hasher):
+        PasswordService.HASHERS[hasher.algorithm] = hasher
+
+    @staticmethod
+    def get_hasher(encoded):
+        algorithm = encoded.split('$', 1)[0] if '$' in encoded else LegacySHA256Hasher.algorithm
+        hasher = PasswordService.HASHERS.get(algorithm)
+        if hasher is None:
+            raise ValueError(f"Unknown password hash algorithm: {algorithm}")
+        return hasher
+
+    @staticmethod
+    def _get_pool():
+        with PasswordService._lock:
+            if PasswordService._pool is None:
+                PasswordService._pool = ProcessPoolExecutor(max_workers=PasswordService.MAX_WORKERS)
+                PasswordService._pending = threading.BoundedSemaphore(PasswordService.MAX_PENDING)
+            return PasswordService._pool, PasswordService._pending
+
+    @staticmethod
+    def _discard_pool(pool):
+        """Drop a broken or shut-down pool so the next caller starts a fresh one"""
+        with PasswordService._lock:
+            if PasswordService._pool is pool:
+                PasswordService._pool = None
+                PasswordService._pending = None
+        pool.shutdown(wait=False)
+
+    @staticmethod
+    def shutdown():
+        with PasswordService._lock:
+            if PasswordService._pool is not None:
+                PasswordService._pool.shutdown(wait=True)
+                PasswordService._pool = None
+                PasswordService._pending = None
+
+    @staticmethod
+    def derive(hasher, password, salt, params):
+        """Run the KDF on the worker pool, or inline when the pool is disabled"""
+        if PasswordService.MAX_WORKERS <= 0:
+            return hasher.derive(password, salt, params)
+
+        pool, pending = PasswordService._get_pool()
+        with pending:
+            try:
+                # Ship the hasher's own derive so hashers registered after the pool started still work
+                future = pool.submit(hasher.derive, password, salt, params)
+            except RuntimeError:
+                # Another thread shut this pool down (or it broke) after we grabbed it
+                PasswordService._discard_pool(pool)
+                return hasher.derive(password, salt, params)
+            try:
+                return future.result()
+            except BrokenProcessPool:
+                # A worker died; start a fresh pool next time and finish this one inline
+                PasswordService._discard_pool(pool)
+                return hasher.derive(password, salt, params)
+
+    @staticmethod
+    def hash_password(password, algorithm=None):
+        hasher = PasswordService.HASHERS[algorithm or PasswordService.DEFAULT_ALGORITHM]
+        params = hasher.params()
+        salt = os.urandom(hasher.salt_bytes)
+        digest = PasswordService.derive(hasher, password, salt, params)
+        return hasher.encode(params, salt, digest)
+
+    @staticmethod
+    def get_dummy_hash():
+        """Default-algorithm hash to verify against when no user matches"""
+        if PasswordService._dummy_hash is None:
+            PasswordService._dummy_hash = PasswordService.hash_password(os.urandom(16).hex())
+        return PasswordService._dummy_hash
+
+    @staticmethod
+    def verify_password(password, encoded):
+        if not encoded:
+            return False
+        try:
+            hasher = PasswordService.get_hasher(encoded)
+            params, salt, digest = hasher.decode(encoded)
+        except (ValueError, KeyError):
+            # Corrupt or unsupported stored hash
+            return False
+        try:
+            candidate = PasswordService.derive(hasher, password, salt, params)
+        except ValueError:
+            # The KDF rejected the stored parameters (e.g. iterations=0)
+            return False
+        return hmac.compare_digest(candidate, digest)
+
+    @staticmethod
+    def needs_rehash(encoded):
+        try:
+            hasher = PasswordService.get_hasher(encoded)
+            if hasher.algorithm != PasswordService.DEFAULT_ALGORITHM:
+                return True
+            return hasher.needs_rehash(encoded)
+        except (ValueError, KeyError):
+            return True
+
+
+if PasswordService.DEFAULT_ALGORITHM not in PasswordService.HASHERS \
+        or PasswordService.DEFAULT_ALGORITHM == LegacySHA256Hasher.algorithm:
+    raise ValueError(f"Invalid PASSWORD_HASH_ALGORITHM: {PasswordService.DEFAULT_ALGORITHM}")
+
+atexit.register(PasswordService.shutdown)
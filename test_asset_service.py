@@ -0,0 +1,154 @@
+"""
+Static Asset Pipeline Tests
+Covers the build step (fingerprints, manifest, pruning), the minifiers and
+the /assets/ route's encoding negotiation and caching headers.
+
+Run with: python -m pytest test_asset_service.py
+"""
+
+import os
+import sys
+import json
+import shutil
+from collections import defaultdict
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT_DIR)
+
+from asset_service import AssetService
+
+
+@pytest.fixture
+def assets(tmp_path, monkeypatch):
+    """Build from a private copy of static/ into a private dist/"""
+    static_dir = tmp_path / 'static'
+    shutil.copytree(os.path.join(ROOT_DIR, 'static'), static_dir)
+    dist_dir = tmp_path / 'dist'
+    monkeypatch.setattr(AssetService, 'STATIC_DIR', str(static_dir))
+    monkeypatch.setattr(AssetService, 'DIST_DIR', str(dist_dir))
+    monkeypatch.setattr(AssetService, 'MANIFEST_PATH', str(dist_dir / 'manifest.json'))
+    monkeypatch.setattr(AssetService, '_manifest', None)
+    monkeypatch.setattr(AssetService, '_manifest_mtime', None)
+    return tmp_path
+
+
+@pytest.fixture
+def client(assets, monkeypatch):
+    monkeypatch.chdir(assets)
+    app_module = pytest.importorskip('app')
+    return app_module.app.test_client()
+
+
+def accepts(**qualities):
+    """Stand-in for werkzeug's Accept-Encoding object (missing encodings have q=0)"""
+    return defaultdict(int, qualities)
+
+
+def touch_later(path, reference):
+    later = os.path.getmtime(reference) + 10
+    os.utime(path, (later, later))
+
+
+def test_build_writes_manifest_and_stable_fingerprints(assets):
+    first = AssetService.build()
+    with open(AssetService.MANIFEST_PATH) as f:
+        manifest = json.load(f)
+    assert manifest == {bundle: stats['file'] for bundle, stats in first.items()}
+    for filename in manifest.values():
+        assert AssetService.FINGERPRINTED_RE.match(filename)
+        assert os.path.isfile(os.path.join(AssetService.DIST_DIR, filename))
+        assert os.path.isfile(os.path.join(AssetService.DIST_DIR, filename + '.gz'))
+
+    second = AssetService.build()
+    assert {b: s['file'] for b, s in second.items()} == manifest
+
+
+def test_old_bundles_stay_servable_until_pruned(assets):
+    old_css = AssetService.build()['app.css']['file']
+    with open(assets / 'static' / 'css' / 'leaderboard.css', 'a') as f:
+        f.write('\n.extra { color: red; }\n')
+    new_css = AssetService.build()['app.css']['file']
+    assert new_css != old_css
+
+    assert AssetService.get_variant(old_css, accepts())[0] == old_css
+    assert AssetService.get_variant(new_css, accepts())[0] == new_css
+
+    old_files = {f for f in os.listdir(AssetService.DIST_DIR) if f.startswith(old_css)}
+    assert set(AssetService.prune()) == old_files
+    assert AssetService.get_variant(old_css, accepts()) == (None, None)
+    remaining = set(os.listdir(AssetService.DIST_DIR))
+    assert 'manifest.json' in remaining
+    assert set(AssetService.get_manifest().values()) <= remaining
+
+
+def test_get_variant_negotiation(assets):
+    css = AssetService.build()['app.css']['file']
+    assert AssetService.get_variant(css, accepts(gzip=1)) == (css + '.gz', 'gzip')
+    assert AssetService.get_variant(css, accepts(gzip=0)) == (css, None)
+    assert AssetService.get_variant(css, accepts(identity=1)) == (css, None)
+
+
+@pytest.mark.parametrize('filename', ['manifest.json', 'manifest.json.tmp', '../app.py', 'app.css'])
+def test_get_variant_rejects_non_bundles(assets, filename):
+    AssetService.build()
+    assert AssetService.get_variant(filename, accepts(gzip=1)) == (None, None)
+
+
+def test_get_bundle_falls_back_when_sources_are_newer(assets):
+    AssetService.build()
+    assert AssetService.get_bundle('app.js')
+    touch_later(assets / 'static' / 'js' / 'app.js', AssetService.MANIFEST_PATH)
+    assert AssetService.get_bundle('app.js') is None
+    assert AssetService.get_bundle('app.css')
+
+
+def test_minify_css_collapses_whitespace_around_comments():
+    assert AssetService.minify_css("a { color: red; }\n/* c */\n.b { x: 'y  z'; }") == "a{color:red}.b{x:'y  z'}"
+
+
+def test_minify_js_keeps_strings_and_regex_literals():
+    source = ("var q = /'/;\n"
+              "    // comment\n"
+              "var c = /\\/\\*/g;\n"
+              "var d = a / b / c;\n"
+              "var s = 'x  // y';\n"
+              "return /[/]x/.test(s)\n")
+    assert AssetService.minify_js(source) == (
+        "var q = /'/;\nvar c = /\\/\\*/g;\nvar d = a / b / c;\nvar s = 'x  // y';\nreturn /[/]x/.test(s)\n")
+
+
+def test_serve_asset_encoding_and_cache_headers(client):
+    css = AssetService.build()['app.css']['file']
+
+    response = client.get(f'/assets/{css}', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.mimetype == 'text/css'
+    assert 'immutable' in response.headers['Cache-Control']
+    assert 'Accept-Encoding' in response.headers['Vary']
+
+    for accept in ('gzip;q=0', 'identity'):
+        response = client.get(f'/assets/{css}', headers={'Accept-Encoding': accept})
+        assert response.status_code == 200
+        assert 'Content-Encoding' not in response.headers
+
+    etag = client.get(f'/assets/{css}', headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+    response = client.get(f'/assets/{css}', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+    assert response.status_code == 304
+
+    assert client.get('/assets/manifest.json').status_code == 404
+
+
+def test_index_uses_bundles_then_falls_back_to_sources(client, assets):
+    bundles = AssetService.build()
+    page = client.get('/').get_data(as_text=True)
+    assert f"/assets/{bundles['app.css']['file']}" in page
+    assert f"/assets/{bundles['app.js']['file']}" in page
+
+    touch_later(assets / 'static' / 'css' / 'style.css', AssetService.MANIFEST_PATH)
+    page = client.get('/').get_data(as_text=True)
+    assert '/static/css/style.css' in page
+    assert '/static/css/leaderboard.css' in page
+    assert f"/assets/{bundles['app.js']['file']}" in page
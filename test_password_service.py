@@ -0,0 +1,165 @@
+"""
+Password Hashing Tests
+Covers the KDF hashers, legacy SHA-256 upgrade on login, malformed stored
+hashes and inline vs. process-pool hashing.
+
+Run with: python -m pytest test_password_service.py
+"""
+
+import os
+import sys
+import json
+import hashlib
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from password_service import PasswordService, PBKDF2Hasher
+from auth_service import AuthService
+
+
+class FastPBKDF2Hasher(PBKDF2Hasher):
+    """Module-level so pool workers can unpickle its derive function"""
+    algorithm = 'pbkdf2_fast'
+    iterations = 1000
+
+
+@pytest.fixture
+def inline():
+    """Hash on the calling thread; restores the pool settings afterwards"""
+    original = PasswordService.MAX_WORKERS
+    PasswordService.shutdown()
+    PasswordService.MAX_WORKERS = 0
+    yield
+    PasswordService.MAX_WORKERS = original
+
+
+@pytest.fixture
+def users_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(AuthService, 'DATA_DIR', str(tmp_path))
+    return tmp_path
+
+
+@pytest.mark.parametrize('algorithm', ['scrypt', 'pbkdf2_sha256'])
+def test_round_trip(inline, algorithm):
+    hashed = PasswordService.hash_password('correct horse', algorithm)
+    assert hashed.startswith(algorithm + '$')
+    assert PasswordService.verify_password('correct horse', hashed)
+    assert not PasswordService.verify_password('wrong horse', hashed)
+
+
+def test_hashes_are_salted(inline):
+    assert PasswordService.hash_password('same') != PasswordService.hash_password('same')
+
+
+def test_needs_rehash(inline):
+    assert not PasswordService.needs_rehash(PasswordService.hash_password('pw'))
+    assert PasswordService.needs_rehash(PasswordService.hash_password('pw', 'pbkdf2_sha256'))
+    assert PasswordService.needs_rehash(hashlib.sha256(b'pw').hexdigest())
+
+
+def test_legacy_sha256_verifies(inline):
+    legacy = hashlib.sha256(b'pw').hexdigest()
+    assert PasswordService.verify_password('pw', legacy)
+    assert not PasswordService.verify_password('nope', legacy)
+
+
+@pytest.mark.parametrize('encoded', [
+    None,
+    '',
+    'scrypt$$AAAA$AAAA',
+    'pbkdf2_sha256$iterations=0$AAAA$AAAA',
+    'pbkdf2_sha256$iterations=abc$AAAA$AAAA',
+    'scrypt$n=16384,r=8,p=1$not-base64!$AAAA',
+    'bcrypt$rounds=12$AAAA$AAAA',
+    'scrypt$too$many$dollar$signs',
+    'café',
+])
+def test_malformed_hashes_fail_closed(inline, encoded):
+    assert PasswordService.verify_password('pw', encoded) is False
+    if encoded:
+        assert PasswordService.needs_rehash(encoded)
+
+
+def test_login_rehashes_legacy_password(inline, users_dir):
+    user, _ = AuthService.register('alice', 'alice@example.com', 'pw')
+    AuthService.update_user(user['id'], {'password': hashlib.sha256(b'pw').hexdigest()})
+
+    logged_in, error = AuthService.login('alice@example.com', 'pw')
+    assert error is None and 'password' not in logged_in
+
+    with open(users_dir / f"{user['id']}.json") as f:
+        stored = json.load(f)['password']
+    assert stored.startswith(PasswordService.DEFAULT_ALGORITHM + '$')
+    assert AuthService.login('alice@example.com', 'pw')[1] is None
+
+
+def test_login_rejects_wrong_password_and_unknown_email(inline, users_dir):
+    AuthService.register('bob', 'bob@example.com', 'pw')
+    assert AuthService.login('bob@example.com', 'wrong') == (None, "Invalid email or password")
+    assert AuthService.login('nobody@example.com', 'pw') == (None, "Invalid email or password")
+
+
+def test_login_survives_corrupt_stored_hash(inline, users_dir):
+    user, _ = AuthService.register('carol', 'carol@example.com', 'pw')
+    AuthService.update_user(user['id'], {'password': 'scrypt$$AAAA$AAAA'})
+    assert AuthService.login('carol@example.com', 'pw') == (None, "Invalid email or password")
+
+
+def test_pool_and_inline_are_interchangeable():
+    original = PasswordService.MAX_WORKERS
+    try:
+        PasswordService.shutdown()
+        PasswordService.MAX_WORKERS = 0
+        inline_hash = PasswordService.hash_password('pw')
+
+        PasswordService.MAX_WORKERS = 2
+        pool_hash = PasswordService.hash_password('pw')
+        assert PasswordService._pool is not None
+        assert PasswordService.verify_password('pw', inline_hash)
+        assert not PasswordService.verify_password('pw', 'pbkdf2_sha256$iterations=0$AAAA$AAAA')
+
+        PasswordService.shutdown()
+        PasswordService.MAX_WORKERS = 0
+        assert PasswordService.verify_password('pw', pool_hash)
+    finally:
+        PasswordService.shutdown()
+        PasswordService.MAX_WORKERS = original
+
+
+def test_hasher_registered_after_pool_start():
+    original = PasswordService.MAX_WORKERS
+    try:
+        PasswordService.shutdown()
+        PasswordService.MAX_WORKERS = 2
+        PasswordService.hash_password('warm up the pool')
+
+        PasswordService.register_hasher(FastPBKDF2Hasher())
+        hashed = PasswordService.hash_password('pw', 'pbkdf2_fast')
+        assert PasswordService.verify_password('pw', hashed)
+        assert not PasswordService.verify_password('nope', hashed)
+    finally:
+        PasswordService.HASHERS.pop('pbkdf2_fast', None)
+        PasswordService.shutdown()
+        PasswordService.MAX_WORKERS = original
+
+
+def test_falls_back_inline_when_pool_is_shut_down_underneath():
+    original = PasswordService.MAX_WORKERS
+    try:
+        PasswordService.shutdown()
+        PasswordService.MAX_WORKERS = 2
+        hashed = PasswordService.hash_password('pw')
+
+        # Simulate another thread shutting the pool down after this one grabbed it
+        stale_pool, _ = PasswordService._get_pool()
+        stale_pool.shutdown(wait=True)
+        assert PasswordService.verify_password('pw', hashed)
+        assert PasswordService._pool is None
+
+        assert PasswordService.verify_password('pw', hashed)
+        assert PasswordService._pool is not None and PasswordService._pool is not stale_pool
+    finally:
+        PasswordService.shutdown()
+        PasswordService.MAX_WORKERS = original